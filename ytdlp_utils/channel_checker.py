@@ -14,46 +14,67 @@ import time
 import yt_dlp
 
 from download_handler import DHMessageThread
+from download_handler import describe_error
+from download_handler import SinkLogger
 from download_handler import Status
 from overwriteable import Overwriteable
 
 
+# Constants
+# -----------------------------------------------------------------------------
+
+
+# Sentinel for URIs missing from the existing channel data
+_MISSING = object()
+
+
 # Function definitions
 # -----------------------------------------------------------------------------
 
 
-def check_data(task, data) -> tuple:
+def channel_data(task) -> dict:
+    """Get the channel data from a task, as it was provided
+
+    @param task Current channel data
+    @return Channel data object, without task-specific data
+    """
+    return { k: v for (k, v) in task.items() if k not in ("idx", "status") }
+
+
+def check_data(task, entries) -> tuple:
     """Check incoming data against existing task data
 
+    Reduces each incoming entry to the common recent uploads format while
+    checking it, so the entries are only iterated once.
+
     @param task Current channel data
-    @param data Incoming recent uploads data
+    @param entries Incoming recent uploads entries, as returned by yt_dlp
     @return 3-tuple; channel data object, list of new (i.e. changed) titles,
     and list of new videos
     """
-    # Initialise stores for title changes and new videos
+    # Initialise stores for reduced data, title changes, and new videos
+    data = []
     new_title = []
     new_video = []
+    # Map existing URIs to titles, for a single lookup per incoming entry
+    o_titles = { x["uri"]: x["title"] for x in task["recent_uploads"] }
     # Loop over the incoming data
-    for n_entry in data:
-        # Assume it's a new video
-        is_new = True
-        for o_entry in task.get("recent_uploads"):
-            # If same URI, mark as not new and check for title change
-            if n_entry.get("uri") == o_entry.get("uri"):
-                is_new = False
-                n_title = n_entry.get("title")
-                o_title = o_entry.get("title")
-                # If the title differs, push to the changed title list
-                if n_title != o_title:
-                    new_title.append((o_title, n_title))
-        # If still new after looping all data, push to the new video list
-        if is_new:
-            new_video.append(n_entry.get("title"))
+    for entry in entries:
+        n_title = entry.get("title")
+        n_uri = entry.get("url")
+        data.append({ "title": n_title, "uri": n_uri, })
+        # If the URI is not known, push to the new video list
+        if (o_title := o_titles.get(n_uri, _MISSING)) is _MISSING:
+            new_video.append(n_title)
+            continue
+        # If the title differs, push to the changed title list
+        if o_title != n_title:
+            new_title.append((o_title, n_title))
     # Build an output dict in the common channel data format
     output = {
         "recent_uploads": data,
-        "title": task.get("title"),
-        "uri": task.get("uri"),
+        "title": task["title"],
+        "uri": task["uri"],
     }
     # Return the 3-tuple of output data, changed titles, and new videos
     return (output, new_title, new_video)
@@ -111,36 +132,15 @@ def status_new_data_body(new_title: list, new_video: list) -> str:
         ]
         t_data_header.append(f"\033[32m{l_v} new video{s_v}\033[m")
         t_data_body.extend(t_data_new_video)
-    # Join the body header text and body additional text
-    t_header = "; ".join(t_data_header)
-    t_body = "\n".join(t_data_body)
-    # Return the combined text for the body
-    return f"{t_header}\n{t_body}"
+    # Add the joined header text as the first line, and join all lines once
+    t_data_body.insert(0, "; ".join(t_data_header))
+    return "\n".join(t_data_body)
 
 
 # Class definitions
 # -----------------------------------------------------------------------------
 
 
-class CustomLogger:
-    """Sink/Ignore all messages"""
-
-    def __init__(self):
-        pass
-
-    def debug(self, message):
-        pass
-
-    def error(self, message):
-        pass
-
-    def info(self, message):
-        pass
-
-    def warning(self, message):
-        pass
-
-
 class CCMessageThread(DHMessageThread):
     """Subclassing to keep the `CC` naming convention"""
     pass
@@ -150,11 +150,32 @@ class CCTaskThread(threading.Thread):
 
     def __init__(self, task_queue, result_queue, message_queue, ytdlp_options):
         super().__init__(daemon=True)
-        self._stopevent = threading.Event()
         self.task_queue = task_queue
         self.result_queue = result_queue
         self.message_queue = message_queue
         self.ytdlp_options = ytdlp_options
+        self.yt = None
+
+    def _fail(self, task: dict, error: Exception = None) -> dict:
+        """Mark a task as failed, and carry its channel data through
+
+        Reports an unexpected error by its description, so it can be told
+        apart from a failed request.
+
+        @param task Task data dict
+        @param error Unexpected error raised by the task (optional)
+        @return Existing channel data, unchanged
+        """
+        if error is None:
+            body = "\033[31mFailed to request channel data\033[m"
+        else:
+            body = f"\033[31mUnexpected error\033[m: {describe_error(error)}"
+        task["status"].update({
+            "prefix": "\033[1;31m✘\033[m",
+            "body": body,
+        })
+        self.update_status(task)
+        return channel_data(task)
 
     def message(self, data: dict) -> None:
         """Put a message on the instance message queue
@@ -167,31 +188,34 @@ class CCTaskThread(threading.Thread):
         """Process a given task; request channel data and check
 
         Marks the status as requesting.  Requests the channel data using the
-        instance yt_dlp options.  Reduces data and checks for changed titles
-        and new videos.  Updates task status with respect to new data, if any.
-        Returns results object, i.e. channel data returned by yt_dlp ops.
+        instance yt_dlp.YoutubeDL object.  Reduces data and checks for changed
+        titles and new videos.  Updates task status with respect to new data,
+        if any.  Returns results object, i.e. channel data returned by yt_dlp
+        ops.  If the request fails or returns no entries, marks the status as
+        failed and returns the existing channel data unchanged.
 
         @param task Task data to process
         @return New channel data from yt_dlp.YoutubeDL
         """
-        task.get("status").update({
+        task["status"].update({
             "prefix": "\033[1;33m?\033[m",
             "body": "\033[36mRequesting channel data\033[m",
         })
         self.update_status(task)
 
-        with yt_dlp.YoutubeDL(self.ytdlp_options) as yt:
-            data = yt.extract_info(task.get("uri"), download=False)
+        try:
+            data = self.yt.extract_info(task["uri"], download=False)
+        except yt_dlp.utils.DownloadError:
+            return self._fail(task)
 
-        data_reduced = list(map(
-            lambda x: { "title": x.get("title"), "uri": x.get("url"), },
-            data.get("entries")))
+        if (entries := data.get("entries")) is None:
+            return self._fail(task)
 
-        (result, new_title, new_video) = check_data(task, data_reduced)
+        (result, new_title, new_video) = check_data(task, entries)
 
         task.update({
             "status": status_new_data(
-                task.get("status"),
+                task["status"],
                 new_title,
                 new_video),
         })
@@ -200,22 +224,27 @@ class CCTaskThread(threading.Thread):
         return result
 
     def run(self):
-        """Run the ChannelChecker task handler"""
-        if self._stopevent.is_set():
-            self._stopevent.clear()
-        while True:
-            try:
-                task = self.task_queue.get(timeout=0.2)
-                result = self.process(task)
-                self.result_queue.put(result)
-                self.task_queue.task_done()
-            except queue.Empty:
-                if self._stopevent.is_set():
+        """Run the ChannelChecker task handler
+
+        Creates a single yt_dlp.YoutubeDL object, using the instance yt_dlp
+        options, to reuse for all tasks processed by this thread.  Blocks on
+        the task queue, and exits on receiving a `None` sentinel.  A task which
+        raises an unexpected error is marked as failed with the error
+        description, and its channel data is carried through, without stopping
+        the thread.
+        """
+        with yt_dlp.YoutubeDL(self.ytdlp_options) as yt:
+            self.yt = yt
+            while True:
+                task = self.task_queue.get()
+                if task is None:
                     break
-
-    def stop(self):
-        """Stop the task thread operations"""
-        self._stopevent.set()
+                try:
+                    result = self.process(task)
+                except Exception as error:
+                    result = self._fail(task, error)
+                self.result_queue.put(result)
+        self.yt = None
 
     def update_status(self, task: dict) -> None:
         """Update a task status message in the instance Overwritable
@@ -223,45 +252,17 @@ class CCTaskThread(threading.Thread):
         @param task Task data dict
         """
         self.message({
-            "idx": task.get("idx"),
-            "text": task.get("status").status,
+            "idx": task["idx"],
+            "text": task["status"].status,
         })
 
 
-class CCResultThread(threading.Thread):
-
-    def __init__(self, result_queue):
-        super().__init__(daemon=True)
-        self._stopevent = threading.Event()
-        self.result = []
-        self.result_queue = result_queue
-
-    def run(self):
-        """Run operations for collecting results queue data"""
-        if self._stopevent.is_set():
-            self._stopevent.clear()
-        while True:
-            try:
-                task = self.result_queue.get(timeout=0.2)
-                self.result.append(task)
-                self.result_queue.task_done()
-            except queue.Empty:
-                if self._stopevent.is_set():
-                    break
-
-    def stop(self):
-        """Stop the result thread operations"""
-        self._stopevent.set()
-
-
 class ChannelChecker:
 
     def __init__(self, data, n_videos: int = 6, n_threads: int = None):
-        self.lock = threading.Lock()
-        self.message_queue = queue.Queue()
+        self.message_queue = queue.SimpleQueue()
         self.screen = Overwriteable()
         self.message_thread = CCMessageThread(
-            self.lock,
             self.screen,
             self.message_queue)
         self.data = data
@@ -295,25 +296,24 @@ class ChannelChecker:
             "text": f"\033[1;32m⁜\033[m Checking {l} channel{s}",
         })
 
-        time_start = time.time()
+        time_start = time.monotonic()
 
         ytdlp_options = {
             "extract_flat": True,
-            "logger": CustomLogger(),
+            "logger": SinkLogger(),
             "playlistend": self.n_videos,
         }
 
-        status_header_pw = max(map(lambda x: len(x.get("title")), self.data))
+        status_header_pw = max(len(x["title"]) for x in self.data)
 
-        task_queue = queue.Queue()
-        result_queue = queue.Queue()
-        result_thread = CCResultThread(result_queue)
+        task_queue = queue.SimpleQueue()
+        result_queue = queue.SimpleQueue()
 
         for (idx, dat) in enumerate(self.data):
             status = Status({
                 "prefix": "\033[33m?\033[m",
                 "header": "\033[35m{t}\033[m".format(
-                    t=dat.get("title").ljust(status_header_pw)),
+                    t=dat["title"].ljust(status_header_pw)),
                 "body": "\033[30mPending\033[m",
             })
             dat.update({
@@ -322,7 +322,7 @@ class ChannelChecker:
             })
             self.message({
                 "idx": idx + 1,  # Hardcoded offset
-                "text": dat.get("status").status,
+                "text": dat["status"].status,
             })
             task_queue.put(dat)
 
@@ -339,26 +339,22 @@ class ChannelChecker:
                     result_queue,
                     self.message_queue,
                     ytdlp_options))
-
-        result_thread.start()
+            task_queue.put(None)
 
         for worker in worker_threads:
             worker.start()
-        for worker in worker_threads:
-            worker.stop()
 
-        task_queue.join()
         for worker in worker_threads:
             worker.join()
 
-        result_thread.stop()
-        result_thread.join()
+        # All workers are done, so collect the results in this thread
+        result = []
+        while not result_queue.empty():
+            result.append(result_queue.get())
 
-        result = list(sorted(
-            result_thread.result,
-            key=lambda x: x.get("title").lower()))
+        result.sort(key=lambda x: x["title"].lower())
 
-        time_end = time.time()
+        time_end = time.monotonic()
 
         self.message({
             "idx": 0,
@@ -374,7 +370,6 @@ class ChannelChecker:
 
     def stop(self) -> None:
         """Stop the instance message handlers"""
-        self.message_queue.join()
         self.message_thread.stop()
         self.message_thread.join()
 
@@ -408,7 +403,7 @@ def main():
     args = parser.parse_args()
 
     with open(args.file_path, "r") as fh:
-        data = json.loads(fh.read())
+        data = json.load(fh)
 
     cc = ChannelChecker(
         data=data,
@@ -417,8 +412,18 @@ def main():
 
     result = cc.run()
 
+    # No channel data was provided, so there is nothing to write
+    if result is None:
+        return
+
+    if len(result) != len(data):
+        raise RuntimeError(
+            f"Only {len(result)} of {len(data)} channels returned a result; "
+            f"not overwriting {args.file_path}")
+
     with open(args.file_path, "w") as fh:
-        fh.write(json.dumps(result, indent=4) + "\n")
+        json.dump(result, fh, indent=4)
+        fh.write("\n")
 
 
 # Entrypoint
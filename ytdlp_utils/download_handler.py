@@ -6,11 +6,13 @@
 
 
 import argparse
+import os
 import queue
 import re
 import sys
 import threading
 import time
+import traceback
 import yt_dlp
 
 from overwriteable import Overwriteable
@@ -22,6 +24,20 @@ from video import Video
 # -----------------------------------------------------------------------------
 
 
+def describe_error(error: Exception) -> str:
+    """Describe an unexpected error, and where it was raised, on one line
+
+    @param error Exception to describe
+    @return Exception type, innermost traceback location, and message
+    """
+    frame = traceback.extract_tb(error.__traceback__)[-1]
+    return "{t} at {f}:{l}: {e}".format(
+        t=type(error).__name__,
+        f=os.path.basename(frame.filename),
+        l=frame.lineno,
+        e=error)
+
+
 def store_video_data(video_ids) -> list:
     """Prepare a default set of data for each video ID
 
@@ -36,18 +52,17 @@ def store_video_data(video_ids) -> list:
     pw = max(map(len, video_ids))
     prefix = "\033[33m?\033[m"
     body = "\033[30mPending\033[m"
-    output = []
-    for vid in video_ids:
-        header = "\033[35m{t}\033[m".format(t=vid.ljust(pw, " "))
-        output.append({
+    return [
+        {
             "status": Status({
                 "prefix": prefix,
-                "header": header,
+                "header": "\033[35m{t}\033[m".format(t=vid.ljust(pw, " ")),
                 "body": body,
             }),
             "video": Video(vid),
-        })
-    return output
+        }
+        for vid in video_ids
+    ]
 
 
 # Auxiliary class definitions
@@ -57,9 +72,11 @@ def store_video_data(video_ids) -> list:
 class ProgressHook:
 
     def __init__(self, task, message_queue):
-        self._last_update = time.time()
+        self._last_update = time.monotonic()
         self.task = task
         self.message_queue = message_queue
+        self.status = task.get("status")
+        self.video = task.get("video")
 
     def message(self, data: dict) -> None:
         """Put a message on the instance message queue
@@ -72,21 +89,25 @@ class ProgressHook:
         """Check the percentage of the current download
 
         If more than ~1/3 of a second since last update, update the status and
-        screen contents.
+        screen contents.  Otherwise, only the video progress is stored.  Skips
+        the check if the total size is not yet known.
 
         @param num Numerator; current downloaded bytes
         @param den Denominator; total downloadable bytes
         """
+        if num is None or not den:
+            return
         pc = round((num / den) * 100, 1)
-        self.task.get("video").set_progress(pc)
-        if time.time() > (self._last_update + 0.333):
-            self.task.get("status").update({
-                "body": "Downloading {s} ({p}%)".format(
-                    s=self.task.get("video").get_stage_text(lower=True),
-                    p=str(pc).rjust(5, " ")),
-            })
-            self.update_status(self.task)
-        self._last_update = time.time()
+        self.video.set_progress(pc)
+        if (now := time.monotonic()) < (self._last_update + 0.333):
+            return
+        self.status.update({
+            "body": "Downloading {s} ({p:5.1f}%)".format(
+                s=self.video.get_stage_text(lower=True),
+                p=pc),
+        })
+        self.update_status(self.task)
+        self._last_update = now
 
     def downloading(self, data: dict) -> None:
         """Progress hook callback for "downloading" stage
@@ -96,17 +117,17 @@ class ProgressHook:
         if not data.get("status") == "downloading":
             return
         if data.get("info_dict").get("fragments", None) is not None:
-            if not self.task.get("video").dash_notified:
-                self.task.get("status").update({
+            if not self.video.dash_notified:
+                self.status.update({
                     "suffix": "\033[33m[!] DASH video\033[m",
                 })
                 self.update_status(self.task)
-                self.task.get("video").dash_notified = True
+                self.video.dash_notified = True
             num = data.get("fragment_index")
-            den = data.get("fargment_count")
+            den = data.get("fragment_count")
         else:
             num = data.get("downloaded_bytes")
-            den = data.get("total_bytes")
+            den = data.get("total_bytes") or data.get("total_bytes_estimate")
         self.check_percentage(num, den)
 
     def update_status(self, task) -> None:
@@ -142,10 +163,12 @@ class Logger:
         "Requested formats are incompatible for merge ",
         "and will be merged into mkv"))
 
-    def __init__(self, task: dict, message_queue: queue.Queue):
+    def __init__(self, task: dict, message_queue: queue.SimpleQueue):
         self.task = task
         self.message_queue = message_queue
-        self._status_last_update = time.time()
+        self.status = task.get("status")
+        self.video = task.get("video")
+        self._status_last_update = time.monotonic()
         # DEBUG ----
         self._count = {
             "debug": 0,
@@ -165,7 +188,7 @@ class Logger:
         """Send an update of the current status via the message queue"""
         self._message({
             "idx": self.task.get("idx"),
-            "text": self.task.get("status").status,
+            "text": self.status.status,
         })
 
     def debug(self, m: str) -> None:
@@ -175,25 +198,25 @@ class Logger:
 
         @param m Message text
         """
-        if any(map(lambda x: m.startswith(x), self._skip_hints)):
+        if m.startswith(self._skip_hints):
             return
         if m.endswith("has already been downloaded"):
-            self.task.get("video").already_downloaded = True
-            self.task.get("status").update({
+            self.video.already_downloaded = True
+            self.status.update({
                 "prefix": "\033[1;32m✓\033[m",
                 "body": "\033[32mAlready downloaded\033[m",
             })
             self._update()
             return
         if m.startswith("[Merger]"):
-            self.task.get("status").update({
+            self.status.update({
                 "body": "\033[36mMerging data\033[m",
             })
             self._update()
             return
         if m.startswith("[download]"):
             if m.startswith("[download] Destination:"):
-                v = self.task.get("video")
+                v = self.video
                 # If stage not yet set, set to video and notify
                 if v.stage is None:
                     v.set_stage(0)
@@ -201,7 +224,7 @@ class Logger:
                 elif v.stage == 0:
                     v.set_stage(1)
                 # Update the status with the current download stage
-                self.task.get("status").update({
+                self.status.update({
                     "body": "Downloading {s}".format(
                         s=v.get_stage_text(lower=True)),
                 })
@@ -209,7 +232,7 @@ class Logger:
                 return
         if (match := self._rex_retry.search(m)) is not None:
             group = match.groupdict()
-            self.task.get("status").update({
+            self.status.update({
                 "suffix": "\033[33m[!] Retry {n} / {m}\033[m".format(
                     n=group.get("n").rjust(len(group.get("m"))),
                     m=group.get("m")),
@@ -217,7 +240,7 @@ class Logger:
             self._update()
             return
         if m == self._download_failure:
-            self.task.get("status").update({
+            self.status.update({
                 "prefix": "\033[1;31m✘\033[m",
                 "body": "\033[31mFailed to download\033[m",
             })
@@ -229,10 +252,10 @@ class Logger:
 
         @param m Message text
         """
-        self._count.update({ "error": self._count.get("error") + 1, })
-        self.task.get("status").update({
+        self._count["error"] += 1
+        self.status.update({
             "body": "Received error message {n}".format(
-                n=self._count.get("error")),
+                n=self._count["error"]),
         })
         self._update()
 
@@ -241,10 +264,10 @@ class Logger:
 
         @param m Message text
         """
-        self._count.update({ "info": self._count.get("info") + 1, })
-        self.task.get("status").update({
+        self._count["info"] += 1
+        self.status.update({
             "body": "Received info message {n}".format(
-                n=self._count.get("info")),
+                n=self._count["info"]),
         })
         self._update()
 
@@ -257,30 +280,72 @@ class Logger:
         """
         if m == self._warn_mkv:
             return
-        self._count.update({ "warning": self._count.get("warning") + 1, })
-        self.task.get("status").update({
+        self._count["warning"] += 1
+        self.status.update({
             "body": "Received warning message {n}".format(
-                n=self._count.get("warning")),
+                n=self._count["warning"]),
         })
         self._update()
 
 
+class SinkLogger:
+    """Custom logger definition for yt_dlp.YoutubeDL
+
+    Skips all messages.  Used wherever yt_dlp output should not reach the
+    screen, e.g. when requesting playlist or channel data.
+    """
+
+    def __init__(self):
+        pass
+
+    def debug(self, m: str) -> None:
+        pass
+
+    def error(self, m: str) -> None:
+        pass
+
+    def info(self, m: str) -> None:
+        pass
+
+    def warning(self, m: str) -> None:
+        pass
+
+
 # DownloadHandler class definitions
 # -----------------------------------------------------------------------------
 
 
 class DHMessageThread(threading.Thread):
 
-    def __init__(self, lock, screen, message_queue):
+    def __init__(self, screen, message_queue):
         super().__init__(daemon=True)
-        self._stopevent = threading.Event()
-        self.lock = lock
         self.screen = screen
         self.message_queue = message_queue
 
+    def _get_messages(self) -> tuple:
+        """Get all messages currently on the message queue
+
+        Blocks until at least one message is available, then takes any others
+        already queued without blocking.  Stops early on the `None` sentinel.
+
+        @return 2-tuple; list of message data, and whether the sentinel was
+        received
+        """
+        messages = []
+        task = self.message_queue.get()
+        while task is not None:
+            messages.append(task)
+            try:
+                task = self.message_queue.get_nowait()
+            except queue.Empty:
+                return (messages, False)
+        return (messages, True)
+
     def handle_message(self, task: dict) -> None:
         """Handle an incoming message using the given dataset
 
+        Applies the message to the screen content, without flushing.
+
         @param task Message data, containing message text and (optionally)
         message index
         """
@@ -288,40 +353,59 @@ class DHMessageThread(threading.Thread):
         if (idx := task.get("idx", None)) is not None:
             if idx < len(self.screen.content):
                 method = "replace_line"
-        with self.lock:
-            getattr(self.screen, method)(**task)
-            self.screen.flush()
+        getattr(self.screen, method)(**task)
 
     def run(self) -> None:
         """Run the message thread operations
 
-        Handles getting tasks from the queue and passing to the message handler
-        method.
+        Handles getting tasks from the queue in bursts and passing each to the
+        message handler method, then flushes the screen once per burst.  Blocks
+        on the message queue, and exits on receiving a `None` sentinel.
         """
-        if self._stopevent.is_set():
-            self._stopevent.clear()
         while True:
-            try:
-                task = self.message_queue.get(timeout=0.2)
-                self.handle_message(task)
-                self.message_queue.task_done()
-            except queue.Empty:
-                if self._stopevent.is_set():
-                    break
+            (messages, stop) = self._get_messages()
+            if len(messages) > 0:
+                for task in messages:
+                    self.handle_message(task)
+                self.screen.flush()
+            if stop:
+                break
 
     def stop(self) -> None:
-        """Stop the message thread operations"""
-        self._stopevent.set()
+        """Stop the message thread operations
+
+        Puts a `None` sentinel on the message queue, so the thread exits after
+        handling all messages sent before the call.
+        """
+        self.message_queue.put(None)
 
 
 class DHTaskThread(threading.Thread):
 
     def __init__(self, task_queue, message_queue):
         super().__init__(daemon=True)
-        self._stopevent = threading.Event()
         self.task_queue = task_queue
         self.message_queue = message_queue
 
+    def _fail(self, task: dict, error: Exception = None) -> None:
+        """Mark a task as failed
+
+        Reports an unexpected error by its description, so it can be told
+        apart from a failed download.
+
+        @param task Dict of data for the failed task
+        @param error Unexpected error raised by the task (optional)
+        """
+        if error is None:
+            body = "\033[31mFailed to download\033[m"
+        else:
+            body = f"\033[31mUnexpected error\033[m: {describe_error(error)}"
+        task.get("status").update({
+            "prefix": "\033[1;31m✘\033[m",
+            "body": body,
+        })
+        self.update_status(task)
+
     def message(self, data: dict) -> None:
         """Put a message on the instance message queue
 
@@ -349,19 +433,16 @@ class DHTaskThread(threading.Thread):
             ],
         })
 
-        time_start = time.time()
+        time_start = time.monotonic()
 
         try:
             with yt_dlp.YoutubeDL(task.get("ytdlp_options")) as yt:
                 yt.download((task.get("video").id,))
         except yt_dlp.utils.DownloadError:
-            task.get("status").update({
-                "prefix": "\033[1;31m✘\033[m",
-                "body": "\033[31mFailed to download\033[m",
-            })
-            self.update_status(task)
+            self._fail(task)
+            return
 
-        time_end = time.time()
+        time_end = time.monotonic()
 
         if task.get("video").already_downloaded:
             return
@@ -377,22 +458,19 @@ class DHTaskThread(threading.Thread):
         """Run task thread operations
 
         Effectively a handler to loop for collecting tasks and running the
-        class `process` method.
+        class `process` method.  Blocks on the task queue, and exits on
+        receiving a `None` sentinel.  A task which raises an unexpected error
+        is marked as failed with the error description, without stopping the
+        thread.
         """
-        if self._stopevent.is_set():
-            self._stopevent.clear()
         while True:
+            task = self.task_queue.get()
+            if task is None:
+                break
             try:
-                task = self.task_queue.get(timeout=0.2)
                 self.process(task)
-                self.task_queue.task_done()
-            except queue.Empty:
-                if self._stopevent.is_set():
-                    break
-
-    def stop(self) -> None:
-        """Stop the task handler operations"""
-        self._stopevent.set()
+            except Exception as error:
+                self._fail(task, error)
 
     def update_status(self, task) -> None:
         """Send the updated task status via the instance message queue
@@ -419,16 +497,15 @@ class DownloadHandler:
             "bestvideo[height=720][fps=30]+bestaudio",
             "bestvideo[height<=480]+bestaudio")),
         "merge_output_format": "mkv",
+        "noprogress": True,
         "outtmpl": "%(uploader)s/%(title)s.%(ext)s",
         "retries": 99,
     }
 
     def __init__(self, video_ids: list = None, max_threads: int = None):
-        self.lock = threading.Lock()
         self.screen = Overwriteable()
-        self.message_queue = queue.Queue()
+        self.message_queue = queue.SimpleQueue()
         self.message_thread = DHMessageThread(
-            self.lock,
             self.screen,
             self.message_queue)
         if video_ids is None:
@@ -437,33 +514,17 @@ class DownloadHandler:
             self.videos = store_video_data(video_ids)
         self.max_threads = max_threads
 
-    def message(self, data: dict) -> None:
-        """Put a message on the instance message queue
+    def _download(self, time_start: float, n_workers: int) -> None:
+        """Download the instance videos using a set of task threads
 
-        @param data Dict of data for the message handler
-        """
-        self.message_queue.put(data)
+        Fills task queue and prepares task threads.  Adds one stop sentinel
+        per task thread to the end of the queue, and starts task threads.
+        Joins the task threads, which exit once the queue is drained.  Reports
+        the total time taken since the given start time.
 
-    def run(self) -> None:
-        """Run the download handler operations
-
-        Starts the message handler.  Exits early if no video IDs are provided.
-        Fills task queue and prepares task threads.  Starts task threads and
-        marks all for stopping on an empty queue.  Joins the task queue to wait
-        until all tasks are complete.  Joins the task threads.  Stops the
-        instance message handlers.
+        @param time_start Start time of the operations, from time.monotonic
+        @param n_workers Number of task threads to use
         """
-        self.message_thread.start()
-        if self.videos is None or len(self.videos) == 0:
-            self.message({
-                "idx": 0,
-                "text": "\033[1;31m✘\033[m No video IDs provided",
-            })
-            self.stop()
-            return
-
-        time_start = time.time()
-
         l = len(self.videos)
         s = "" if l == 1 else "s"
         self.message({
@@ -471,12 +532,8 @@ class DownloadHandler:
             "text": f"\033[1;32m⁜\033[m Downloading {l} video{s}",
         })
 
-        task_queue = queue.Queue()
-        for (idx, vid) in enumerate(self.videos):
-            vid.update({
-                "idx": idx + 1,  # Hardcoded offset
-                "ytdlp_options": self.ytdlp_options.copy(),
-            })
+        task_queue = queue.SimpleQueue()
+        for vid in self.videos:
             task_queue.put(vid)
             self.message({
                 "idx": vid.get("idx"),
@@ -484,23 +541,17 @@ class DownloadHandler:
             })
 
         workers = []
-        if self.max_threads is None:
-            n_workers = 1
-        else:
-            n_workers = self.max_threads
         for _ in range(0, n_workers):
             workers.append(DHTaskThread(task_queue, self.message_queue))
+            task_queue.put(None)
 
         for w in workers:
             w.start()
-        for w in workers:
-            w.stop()
 
-        task_queue.join()
         for w in workers:
             w.join()
 
-        time_end = time.time()
+        time_end = time.monotonic()
 
         self.message({
             "idx": 0,
@@ -510,11 +561,48 @@ class DownloadHandler:
                 t=round(time_end - time_start, 1)),
         })
 
+    def message(self, data: dict) -> None:
+        """Put a message on the instance message queue
+
+        @param data Dict of data for the message handler
+        """
+        self.message_queue.put(data)
+
+    def run(self) -> None:
+        """Run the download handler operations
+
+        Starts the message handler.  Exits early if no video IDs are provided.
+        Sets the index and yt-dlp options for each video, and downloads all
+        videos.  Stops the instance message handlers.
+        """
+        self.message_thread.start()
+        if self.videos is None or len(self.videos) == 0:
+            self.message({
+                "idx": 0,
+                "text": "\033[1;31m✘\033[m No video IDs provided",
+            })
+            self.stop()
+            return
+
+        time_start = time.monotonic()
+
+        for (idx, vid) in enumerate(self.videos):
+            vid.update({
+                "idx": idx + 1,  # Hardcoded offset
+                "ytdlp_options": self.ytdlp_options.copy(),
+            })
+
+        if self.max_threads is None:
+            n_workers = 1
+        else:
+            n_workers = self.max_threads
+
+        self._download(time_start, n_workers)
+
         self.stop()
 
     def stop(self) -> None:
         """Stop the instance message handlers"""
-        self.message_queue.join()
         self.message_thread.stop()
         self.message_thread.join()
 
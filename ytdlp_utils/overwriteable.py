@@ -5,7 +5,6 @@
 # -----------------------------------------------------------------------------
 
 
-import io
 import os
 import sys
 
@@ -41,25 +40,35 @@ class Overwriteable:
     """
 
     def __init__(self, stream=sys.stdout):
-        self.buffer = io.StringIO(initial_value="", newline="\n")
         self.content = []
-        self.lastlines = 0
+        self.lastdraw = []
         self.stream = stream
 
-    def _build(self) -> None:
-        """Build the string buffer contents
+    def _build(self) -> str:
+        """Build the output for the current content
 
-        Seeks the start of the string buffer and truncates.  Joins content
-        lines by newline.  Prints joined content into the instance string
-        buffer.
+        Truncates content lines to the terminal width and splits them into
+        display lines.  Finds the first display line which differs from the
+        previous draw, and joins the display lines from there, prefixed by the
+        sequence to clear the previously drawn lines which changed.
+
+        @return Output to write, or an empty string if nothing changed
         """
-        self.buffer.seek(0, 0)
-        self.buffer.truncate(0)
         max_len = os.get_terminal_size().columns
-        output = "\n".join(map(
+        lines = "\n".join(map(
             lambda x: truncate_line(x, max_len),
-            self.content))
-        print(output, end="\n", file=self.buffer)
+            self.content)).split("\n")
+        first = 0
+        for (old, new) in zip(self.lastdraw, lines):
+            if old != new:
+                break
+            first += 1
+        n_clear = len(self.lastdraw) - first
+        self.lastdraw = lines
+        output = "".join(map(lambda x: f"{x}\n", lines[first:]))
+        if n_clear > 0:
+            output = f"\033[{n_clear}F\033[J{output}"
+        return output
 
     def add_line(self, text: str, idx: int = None) -> None:
         """Add a line to the instance content store
@@ -75,20 +84,12 @@ class Overwriteable:
     def flush(self) -> None:
         """Flush the current contents to the instance stream
 
-        Builds the content in the instance string buffer.  Clears previous text
-        printed to the stream.  Reads the string buffer contents and prints to
-        the stream.  Counts lines in the most recent output draw.  Empties the
-        string buffer.
+        Builds the output for the changed content, and writes it to the stream
+        in a single write.  Skips the write if nothing changed.
         """
-        self._build()
-        if self.lastlines > 0:
-            print(f"\033[{self.lastlines}F\033[J", end="", file=self.stream)
-        self.buffer.seek(0, 0)
-        output = self.buffer.read()
-        print(output, end="", file=self.stream)
-        self.lastlines = output.count("\n")
-        self.buffer.seek(0, 0)
-        self.buffer.truncate(0)
+        if output := self._build():
+            self.stream.write(output)
+            self.stream.flush()
 
     def replace_line(self, idx: int, text: str) -> None:
         """Replace a line in the instance content store
@@ -96,5 +97,4 @@ class Overwriteable:
         @param idx Index at which to replace the line
         @param text Text to use to replace the line
         """
-        self.content.pop(idx)
-        self.content.insert(idx, text)
+        self.content[idx] = text
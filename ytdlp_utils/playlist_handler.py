@@ -5,7 +5,6 @@
 # -----------------------------------------------------------------------------
 
 
-import queue
 import sys
 import time
 import yt_dlp
@@ -13,8 +12,8 @@ import yt_dlp
 from status import Status
 from video import Video
 
-from download_handler import DHTaskThread
 from download_handler import DownloadHandler
+from download_handler import SinkLogger
 
 
 # Function definitions
@@ -70,46 +69,19 @@ def store_video_data(video_ids) -> list:
     pw = len(str(l))
     prefix = "\033[33m?\033[m"
     body = "\033[30mPending\033[m"
-    output = []
-    for (idx, vid) in enumerate(video_ids):
-        header = "\033[35mVideo {c} / {t}\033[m".format(
-            c=str(idx + 1).rjust(pw, " "),
-            t=l)
-        output.append({
+    return [
+        {
             "status": Status({
                 "prefix": prefix,
-                "header": header,
+                "header": "\033[35mVideo {c} / {t}\033[m".format(
+                    c=str(idx + 1).rjust(pw, " "),
+                    t=l),
                 "body": body,
             }),
             "video": Video(vid),
-        })
-    return output
-
-
-# Auxiliary class definitions
-# -----------------------------------------------------------------------------
-
-
-class SinkLogger:
-    """Custom logger definition for requesting playlist data
-
-    Skips all messages.
-    """
-
-    def __init__(self):
-        pass
-
-    def debug(self, m: str) -> None:
-        pass
-
-    def error(self, m: str) -> None:
-        pass
-
-    def info(self, m: str) -> None:
-        pass
-
-    def warning(self, m: str) -> None:
-        pass
+        }
+        for (idx, vid) in enumerate(video_ids)
+    ]
 
 
 # PlaylistHandler class definitions
@@ -130,14 +102,11 @@ class PlaylistHandler(DownloadHandler):
     def run(self) -> None:
         """Run the playlist handler operations
 
-        Starts the message handler.  Exits early if no video IDs are provided.
-        Fills task queue and prepares task threads.  Starts task threads and
-        marks all for stopping on an empty queue.  Joins the task queue to wait
-        until all tasks are complete.  Joins the task threads.  Stops the
-        instance message handlers.
+        Starts the message handler.  Requests the playlist data, and downloads
+        all videos in the playlist.  Stops the instance message handlers.
         """
         self.message_thread.start()
-        time_start = time.time()
+        time_start = time.monotonic()
 
         self.message({
             "idx": 0,
@@ -152,47 +121,12 @@ class PlaylistHandler(DownloadHandler):
                 yt.extract_info(self.id),
                 self.ytdlp_options.copy())
 
-        l = len(self.videos)
-        s = "" if l == 1 else "s"
-        self.message({
-            "idx": 0,
-            "text": f"\033[1;32m⁜\033[m Downloading {l} video{s}",
-        })
-
-        task_queue = queue.Queue()
-        for (idx, vid) in enumerate(self.videos):
-            task_queue.put(vid)
-            self.message({
-                "idx": vid.get("idx"),
-                "text": vid.get("status").status,
-            })
-
-        workers = []
         if self.max_threads is None:
             n_workers = len(self.videos)
         else:
             n_workers = self.max_threads
-        for _ in range(0, n_workers):
-            workers.append(DHTaskThread(task_queue, self.message_queue))
 
-        for w in workers:
-            w.start()
-        for w in workers:
-            w.stop()
-
-        task_queue.join()
-        for w in workers:
-            w.join()
-
-        time_end = time.time()
-
-        self.message({
-            "idx": 0,
-            "text": "\033[1;32m⁜\033[m Downloaded {l} video{s} in {t}s".format(
-                l=l,
-                s=s,
-                t=round(time_end - time_start, 1)),
-        })
+        self._download(time_start, n_workers)
 
         self.stop()
 
@@ -8,14 +8,18 @@
 class Status:
     """Collect data relating to the status of an item"""
 
-    _accept_keys = [
+    _accept_keys = (
         "prefix",
         "header",
         "body",
         "suffix",
-    ]
+    )
+
+    __slots__ = (*_accept_keys, "status")
 
     def __init__(self, data):
+        for k in self._accept_keys:
+            setattr(self, k, None)
         self.update(data)
 
     def _build(self) -> None:
@@ -24,9 +28,8 @@ class Status:
         Gets all data per acceptable key, and eliminates values which are None.
         Joins remainder separated by a single space.
         """
-        to_use = map(lambda x: getattr(self, x, None), self._accept_keys)
-        to_use = filter(lambda x: x is not None, to_use)
-        self.status = " ".join(to_use)
+        to_use = map(lambda x: getattr(self, x), self._accept_keys)
+        self.status = " ".join(x for x in to_use if x is not None)
 
     def update(self, data: dict) -> None:
         """Update the status data
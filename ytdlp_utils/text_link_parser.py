@@ -15,9 +15,12 @@ import re
 
 
 REX_DEFAULT = [
-    re.compile(r"[\?&]v\=(?P<id>[^\?&]+)"),                # Normal
-    re.compile(r"youtube\.com\/shorts\/(?P<id>[^\?&]+)"),  # "Shorts"
-    re.compile(r"youtu\.be\/(?P<id>[\?&]+)"),              # Compact
+    re.compile("".join((
+        r"(?:",
+        r"[\?&]v\=|",                # Normal
+        r"youtube\.com\/shorts\/|",  # "Shorts"
+        r"youtu\.be\/",              # Compact
+        r")(?P<id>[^\?&]+)"))),
 ]
 
 
@@ -50,23 +53,22 @@ def extract_from_file(path: str, rex: list) -> list:
 def read_file(path: str) -> list:
     """Read text links from the file at the given path
 
-    Removes comments, including trailing comments, and empty lines.
+    Removes comments, including trailing comments, and empty lines.  Lines
+    are streamed from the file handle, rather than reading the whole file
+    into memory and splitting it.
 
     @param path Path to the text links file
     @return List of links found within the file
     """
     with open(path, "r") as fh:
-        raw_data = fh.read().split("\n")
+        # Trim whitespace on each line, if any, including the newline
+        data_trimmed = map(lambda x: x.strip(), fh)
 
-    # The file _should_ end with a single newline, but could be malformed
-    if raw_data[-1] == "":
-        raw_data = raw_data[:-1]
-
-    # Trim whitespace on each line, if any
-    data_trimmed = map(lambda x: x.strip(), raw_data)
-
-    # Eliminate comment lines and empty lines
-    data_reduced = functools.reduce(reduce_comment_empty, data_trimmed, [])
+        # Eliminate comment lines and empty lines
+        data_reduced = functools.reduce(
+            reduce_comment_empty,
+            data_trimmed,
+            [])
 
     # Eliminate trailing comments
     data_cleaned = list(map(remove_comment, data_reduced))
@@ -100,10 +102,9 @@ def reduce_result(acc: list, crt: str, rex: list) -> list:
     """
     for r in rex:
         if (m := r.search(crt)) is not None:
-            g = m.groupdict()
-            if g.get("id", None) is None:
+            if not "id" in r.groupindex:
                 raise RuntimeError("Regex missing `id` capture group")
-            acc.append(g.get("id"))
+            acc.append(m.group("id"))
             break
     return acc
 
@@ -8,6 +8,14 @@
 class Video:
     """Class to collect and handle data for each video download"""
 
+    __slots__ = (
+        "already_downloaded",
+        "dash_notified",
+        "id",
+        "progress",
+        "stage",
+    )
+
     _stage = {
         0: "Video",
         1: "Audio",
@@ -15,6 +23,7 @@ class Video:
 
     def __init__(self, video_id: str):
         self.already_downloaded = False
+        self.dash_notified = False
         self.id = video_id
         self.progress = {
             0: 0.0,
@@ -38,7 +47,7 @@ class Video:
 
         @param percentage Percentage completion of the current download
         """
-        self.progress.update({ self.stage: percentage, })
+        self.progress[self.stage] = percentage
 
     def set_stage(self, stage: int) -> None:
         """Set the video download stage